@@ -2,7 +2,7 @@ import argparse
 import inspect
 import secrets
 from pathlib import Path
-from typing import TypeVar, Callable, Awaitable, Union, overload, cast
+from typing import Any, TypeVar, Callable, Awaitable, Union, overload, cast
 from helpers import dotenv, rfc, settings, files
 import asyncio
 import threading
@@ -101,15 +101,10 @@ async def call_development_function(
     if is_development():
         url = _get_rfc_url()
         password = _get_rfc_password()
-        # Normalize path components to build a valid Python module path across OSes
-        module_path = Path(
-            files.deabsolute_path(func.__code__.co_filename)
-        ).with_suffix("")
-        module = ".".join(module_path.parts)  # __module__ is not reliable
         result = await rfc.call_rfc(
             url=url,
             password=password,
-            module=module,
+            module=_get_function_module(func),
             function_name=func.__name__,
             args=list(args),
             kwargs=kwargs,
@@ -122,6 +117,40 @@ async def call_development_function(
             return func(*args, **kwargs)  # type: ignore
 
 
+async def call_development_batch(
+    calls: list[tuple[Callable[..., Any], tuple, dict]],
+) -> list[Any]:
+    """
+    Run several (func, args, kwargs) calls in order with a single RFC
+    round trip in development mode. Returns results in call order.
+    """
+    if is_development():
+        payload = [
+            [_get_function_module(func), func.__name__, list(args), kwargs]
+            for func, args, kwargs in calls
+        ]
+        return await call_development_function(_run_batch, payload)
+    return [
+        await call_development_function(func, *args, **kwargs)
+        for func, args, kwargs in calls
+    ]
+
+
+async def _run_batch(payload: list[list[Any]]) -> list[Any]:
+    return [
+        await rfc._call_function(module, function_name, *args, **kwargs)
+        for module, function_name, args, kwargs in payload
+    ]
+
+
+def _get_function_module(func: Callable) -> str:
+    # Normalize path components to build a valid Python module path across OSes
+    module_path = Path(
+        files.deabsolute_path(func.__code__.co_filename)
+    ).with_suffix("")
+    return ".".join(module_path.parts)  # __module__ is not reliable
+
+
 async def handle_rfc(rfc_call: rfc.RFCCall):
     return await rfc.handle_rfc(rfc_call=rfc_call, password=_get_rfc_password())
 
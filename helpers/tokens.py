@@ -1,24 +1,85 @@
+import functools
+import threading
+from collections import OrderedDict
 from typing import Literal
 import tiktoken
 
 APPROX_BUFFER = 1.1
 TRIM_BUFFER = 0.8
 
+# Bounded LRU of token counts for short texts (e.g. file lines), keyed by
+# (encoding, hash(text)) so the texts themselves are not retained
+LINE_CACHE_SIZE = 10000
+_line_cache: OrderedDict[tuple[str, int], int] = OrderedDict()
+_line_cache_lock = threading.Lock()
+
+# tiktoken's threaded batch builds a thread pool per call and a future per
+# text, so it only pays off for large inputs
+BATCH_THREADS_MIN_CHARS = 1 << 20
+BATCH_THREADS = 4
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding(encoding_name: str) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(encoding_name)
+
 
 def count_tokens(text: str, encoding_name="cl100k_base") -> int:
     if not text:
         return 0
 
     # Get the encoding
-    encoding = tiktoken.get_encoding(encoding_name)
+    encoding = _get_encoding(encoding_name)
 
-    # Encode the text and count the tokens
-    tokens = encoding.encode(text, disallowed_special=())
+    # Encode the text and count the tokens (special tokens as plain text)
+    tokens = encoding.encode_ordinary(text)
     token_count = len(tokens)
 
     return token_count
 
 
+def count_tokens_batch(texts: list[str], encoding_name="cl100k_base") -> list[int]:
+    if not texts:
+        return []
+
+    keys = [(encoding_name, hash(text)) for text in texts]
+    counts: list[int] = [0] * len(texts)
+    missing: dict[tuple[str, int], list[int]] = {}  # repeated lines encode once
+    with _line_cache_lock:
+        for i, key in enumerate(keys):
+            cached = _line_cache.get(key)
+            if cached is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                _line_cache.move_to_end(key)
+                counts[i] = cached
+
+    if not missing:
+        return counts
+
+    encoding = _get_encoding(encoding_name)
+
+    pending = [texts[indices[0]] for indices in missing.values()]
+    if sum(map(len, pending)) >= BATCH_THREADS_MIN_CHARS:
+        batch = encoding.encode_ordinary_batch(pending, num_threads=BATCH_THREADS)
+    else:
+        batch = [encoding.encode_ordinary(text) for text in pending]
+    with _line_cache_lock:
+        for (key, indices), tokens in zip(missing.items(), batch):
+            count = len(tokens)
+            _line_cache[key] = count
+            for i in indices:
+                counts[i] = count
+        while len(_line_cache) > LINE_CACHE_SIZE:
+            _line_cache.popitem(last=False)
+    return counts
+
+
+def clear_line_cache():
+    with _line_cache_lock:
+        _line_cache.clear()
+
+
 def approximate_tokens(
     text: str,
 ) -> int:
@@ -4,28 +4,82 @@ Pure file operations for the text_editor plugin.
 No agent/tool dependencies — only stdlib + tokens helper.
 """
 
+import asyncio
+import functools
 import os
-import shutil
+import stat
+import sys
 import tempfile
-from typing import TypedDict
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypedDict
 
 from helpers import tokens
 
 _BINARY_PEEK = 8192
+_COPY_CHUNK = 1 << 20
+# Line scans start small, as patch gaps are usually a few lines, and
+# double up to the max on long runs
+_SCAN_CHUNK = 1 << 12
+_SCAN_CHUNK_MAX = 1 << 20
+# File-to-file sendfile() is only supported on Linux
+_USE_SENDFILE = sys.platform.startswith("linux") and hasattr(os, "sendfile")
+# Anonymous temp files need O_TMPFILE and /proc to link them into place
+_USE_TMPFILE = hasattr(os, "O_TMPFILE") and os.path.isdir("/proc/self/fd")
+# apply_patch batches edit content and short gaps into writes of this
+# size; longer gaps are copied by the kernel instead
+_WRITE_CHUNK = 1 << 16
+_INLINE_GAP = 1 << 12
+# Bytes of source per remaining budget token to tokenize in one batch
+_CHUNK_BYTES_PER_TOKEN = 5
+
+# Worker threads for read_file_async, created on first use
+_read_pool: ThreadPoolExecutor | None = None
+
+# Recently read file contents, keyed by (realpath, inode, mtime_ns, size)
+# and bounded by total bytes; writes through this module evict their path.
+# Larger files are not kept and are read in bounded chunks instead
+READ_CACHE_BYTES = 16 << 20
+_READ_CACHE_MAX_FILE = 4 << 20
+_read_cache: OrderedDict[tuple[str, int, int, int], bytes] = OrderedDict()
+_read_cache_bytes = 0
+_read_cache_lock = threading.Lock()
+# read_file refuses larger files before touching their contents
+MAX_READ_BYTES = 64 << 20
 
 
 # ------------------------------------------------------------------
 # Binary detection
 # ------------------------------------------------------------------
 
-def is_binary(path: str) -> bool:
-    """Detect binary file by checking for null bytes."""
-    try:
-        with open(path, "rb") as f:
-            chunk = f.read(_BINARY_PEEK)
-        return b"\x00" in chunk
-    except OSError:
-        return False
+def is_binary(path: str, head: bytes | None = None) -> bool:
+    """
+    Detect binary file by checking for null bytes.
+    Pass head (the file's leading bytes) to skip opening path again.
+    """
+    if head is None:
+        try:
+            with open(path, "rb") as f:
+                head = f.read(_BINARY_PEEK)
+        except OSError:
+            return False
+    return b"\x00" in head[:_BINARY_PEEK]
+
+
+# ------------------------------------------------------------------
+# Line counting
+# ------------------------------------------------------------------
+
+def count_content_lines(content: str | bytes) -> int:
+    """Count lines in content; an unterminated last line counts as one."""
+    if isinstance(content, bytes):
+        return content.count(b"\n") + (
+            1 if content and not content.endswith(b"\n") else 0
+        )
+    return content.count("\n") + (
+        1 if content and not content.endswith("\n") else 0
+    )
 
 
 # ------------------------------------------------------------------
@@ -43,15 +97,17 @@ class FileInfo(TypedDict):
 def file_info(path: str) -> FileInfo:
     """Return file metadata for mtime tracking and path resolution."""
     path = os.path.expanduser(path)
-    rp = os.path.realpath(path)
-    exists = os.path.exists(path)
-    is_file = os.path.isfile(path)
-    mtime = None
-    if exists:
-        try:
-            mtime = os.path.getmtime(path)
-        except OSError:
-            pass
+    rp = path  # kept for paths realpath rejects (embedded NUL)
+    # One stat answers exists/is_file/mtime
+    try:
+        rp = os.path.realpath(path)
+        st = os.stat(path)
+    except (OSError, ValueError):
+        exists, is_file, mtime = False, False, None
+    else:
+        exists = True
+        is_file = stat.S_ISREG(st.st_mode)
+        mtime = st.st_mtime
     return FileInfo(
         exists=exists,
         is_file=is_file,
@@ -79,6 +135,7 @@ def read_file(
     max_line_tokens: int = 500,
     default_line_count: int = 100,
     max_total_read_tokens: int = 4000,
+    max_bytes: int = MAX_READ_BYTES,
 ) -> ReadResult:
     """
     Read a text file and return numbered lines with token budgeting.
@@ -86,89 +143,163 @@ def read_file(
     Line numbers are 1-based (matching grep, sed, editors).
     line_from and line_to are both inclusive.
     None line_to defaults to line_from + default_line_count - 1.
+    Files over max_bytes are rejected with a "file too large" error.
     """
     path = os.path.expanduser(path)
 
-    if not os.path.isfile(path):
+    line_from = max(line_from, 1)
+    if line_to is None:
+        line_to = line_from + default_line_count - 1
+    try:
+        opened = _open_regular_file(path, max_bytes)
+    except OSError as exc:
         return ReadResult(
             content="", total_lines=0, warnings="",
-            error="file not found",
+            error=str(exc),
         )
-
-    if is_binary(path):
+    if opened is None:
         return ReadResult(
             content="", total_lines=0, warnings="",
-            error="file appears binary, use terminal instead",
+            error="file not found",
         )
 
+    fd, st = opened
     try:
-        with open(path, "r", encoding="utf-8", errors="replace") as f:
-            all_lines = f.readlines()
+        if st.st_size <= _READ_CACHE_MAX_FILE:
+            read = functools.partial(_read_slice, _read_whole(fd, path, st))
+        else:
+            # Larger files are scanned in bounded chunks straight off the fd
+            read = functools.partial(_pread, fd)
+
+        if is_binary(path, read(_BINARY_PEEK, 0)):
+            return ReadResult(
+                content="", total_lines=0, warnings="",
+                error="file appears binary, use terminal instead",
+            )
+
+        # Index the window by byte offset, then decode only the window
+        start, head_lines, _ = _skip_lines(read, 0, line_from - 1)
+        end, window_lines, _ = _skip_lines(
+            read, start, max(line_to - line_from + 1, 0)
+        )
+        window = read(end - start, start).decode("utf-8", errors="replace")
+        # Carry on from the window to count the remaining lines
+        total_lines = head_lines + window_lines + _skip_lines(read, end, None)[1]
     except OSError as exc:
         return ReadResult(
             content="", total_lines=0, warnings="",
             error=str(exc),
         )
+    finally:
+        os.close(fd)
+
+    line_to = max(min(line_to, total_lines), line_from - 1)
 
-    total_lines = len(all_lines)
+    content, warnings = _score_lines(
+        _split_lines(window),
+        line_from,
+        len(str(line_to)),
+        max_line_tokens,
+        max_total_read_tokens,
+    )
+    return ReadResult(
+        content=content,
+        total_lines=total_lines,
+        warnings=warnings,
+        error="",
+    )
+
+
+def format_content_for_display(
+    content: str,
+    line_from: int = 1,
+    line_to: int | None = None,
+    max_line_tokens: int = 500,
+    default_line_count: int = 100,
+    max_total_read_tokens: int = 4000,
+) -> ReadResult:
+    """
+    Number and budget in-memory content exactly as read_file would show
+    the same text read from disk, without touching the filesystem.
+    """
+    total_lines = count_content_lines(content)
     line_from = max(line_from, 1)
     if line_to is None:
         line_to = line_from + default_line_count - 1
-    line_to = min(line_to, total_lines)
-
-    # Convert 1-based inclusive range to 0-based slice
-    idx_from = line_from - 1
-    idx_to = line_to  # slice is exclusive, line_to is inclusive 1-based
-    selected = all_lines[idx_from:idx_to]
-    num_width = len(str(line_to))
-
-    warn_parts: list[str] = []
-    cropped_lines: list[int] = []
-    output_lines: list[str] = []
-    running_tokens = 0
-    trimmed_by_total = False
+    line_to = max(min(line_to, total_lines), line_from - 1)
+
+    # Split only up to the window; the rest stays one unsplit tail
+    lines = content.split("\n", line_to)[line_from - 1:line_to]
+    if "\r" in content:
+        lines = [line.rstrip("\r") for line in lines]
+
+    text, warnings = _score_lines(
+        lines,
+        line_from,
+        len(str(line_to)),
+        max_line_tokens,
+        max_total_read_tokens,
+    )
+    return ReadResult(
+        content=text,
+        total_lines=total_lines,
+        warnings=warnings,
+        error="",
+    )
 
-    for i, raw_line in enumerate(selected):
-        line_no = line_from + i  # 1-based
-        stripped = raw_line.rstrip("\n").rstrip("\r")
-        line_tok = tokens.count_tokens(stripped)
 
-        if line_tok > max_line_tokens:
-            chars_per_tok = max(len(stripped) / line_tok, 1)
-            keep_chars = int(max_line_tokens * chars_per_tok * tokens.TRIM_BUFFER)
-            stripped = stripped[:keep_chars] + "..."
-            cropped_lines.append(line_no)
-            line_tok = max_line_tokens
+async def read_file_async(
+    path: str,
+    line_from: int = 1,
+    line_to: int | None = None,
+    max_line_tokens: int = 500,
+    default_line_count: int = 100,
+    max_total_read_tokens: int = 4000,
+    max_bytes: int = MAX_READ_BYTES,
+) -> ReadResult:
+    """read_file on a worker thread, keeping I/O and tokenization off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_read_pool(),
+        functools.partial(
+            read_file,
+            path,
+            line_from=line_from,
+            line_to=line_to,
+            max_line_tokens=max_line_tokens,
+            default_line_count=default_line_count,
+            max_total_read_tokens=max_total_read_tokens,
+            max_bytes=max_bytes,
+        ),
+    )
 
-        if running_tokens + line_tok > max_total_read_tokens:
-            trimmed_by_total = True
-            break
 
-        running_tokens += line_tok
-        output_lines.append(f"{line_no:>{num_width}} {stripped}")
+async def read_files_batch(
+    specs: list[dict],
+    max_line_tokens: int = 500,
+    default_line_count: int = 100,
+    max_total_read_tokens: int = 4000,
+    max_bytes: int = MAX_READ_BYTES,
+) -> list[ReadResult]:
+    """
+    Read several files concurrently in one call, so a caller going through
+    the development RFC needs only one round trip for all of them.
 
-    if cropped_lines:
-        nums = " ".join(str(n) for n in cropped_lines)
-        warn_parts.append(
-            f"long lines {nums} cropped - use terminal for precise manipulation"
-        )
-    if trimmed_by_total:
-        actual_end = line_from + len(output_lines)
-        warn_parts.append(
-            f"output trimmed at line {actual_end} due to token limit"
-            " - use line_from/line_to for remaining"
+    Each spec is {path, line_from?, line_to?}; budgets apply per file.
+    Concurrency is bounded by the read worker pool. Results follow specs.
+    """
+    return list(await asyncio.gather(*(
+        read_file_async(
+            spec["path"],
+            line_from=spec.get("line_from", 1),
+            line_to=spec.get("line_to"),
+            max_line_tokens=max_line_tokens,
+            default_line_count=default_line_count,
+            max_total_read_tokens=max_total_read_tokens,
+            max_bytes=max_bytes,
         )
-
-    warn_str = ""
-    if warn_parts:
-        warn_str = "\nwarning: " + "; ".join(warn_parts)
-
-    return ReadResult(
-        content="\n".join(output_lines),
-        total_lines=total_lines,
-        warnings=warn_str,
-        error="",
-    )
+        for spec in specs
+    )))
 
 
 # ------------------------------------------------------------------
@@ -180,22 +311,44 @@ class WriteResult(TypedDict):
     error: str
 
 
-def write_file(path: str, content: str | None) -> WriteResult:
-    """Create or overwrite a file."""
+def write_file(
+    path: str,
+    content: str | None,
+    durable: bool = False,
+    skip_if_unchanged: bool = True,
+) -> WriteResult:
+    """
+    Create or overwrite a file.
+    durable fsyncs the file and its directory before returning.
+    skip_if_unchanged leaves a file that already holds content untouched,
+    keeping its mtime; pass False to always rewrite. Durable writes are
+    never skipped, since the existing data may not be synced yet.
+    """
     if content is None:
         content = ""
     path = os.path.expanduser(path)
+    data = content.encode("utf-8")
+    if skip_if_unchanged and not durable and _has_content(path, data):
+        return WriteResult(total_lines=count_content_lines(data), error="")
     try:
         os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
+        # Raw fd: one write of the encoded content, no buffered copy.
+        # O_BINARY so Windows does not turn "\n" into "\r\n"
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+        fd = os.open(path, flags, 0o666)
+        try:
+            _write_all(fd, data)
+            if durable:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+            _evict_read_cache(path)
+        if durable:
+            _fsync_dir(os.path.dirname(path) or ".")
     except OSError as exc:
         return WriteResult(total_lines=0, error=str(exc))
 
-    total = content.count("\n") + (
-        1 if content and not content.endswith("\n") else 0
-    )
-    return WriteResult(total_lines=total, error="")
+    return WriteResult(total_lines=count_content_lines(data), error="")
 
 
 # ------------------------------------------------------------------
@@ -225,6 +378,8 @@ def validate_edits(edits: list | None) -> tuple[list[dict], str]:
         return [], "edits array is required"
 
     parsed: list[dict] = []
+    in_order = True  # LLM-emitted edits usually arrive sorted
+    prev_key: tuple[int, int] | None = None
     for e in edits:
         if not isinstance(e, dict):
             return [], f"invalid edit entry: {e}"
@@ -242,8 +397,13 @@ def validate_edits(edits: list | None) -> tuple[list[dict], str]:
             "content": e.get("content", ""),
             "insert": is_insert,
         })
+        key = (frm, 0 if is_insert else 1)
+        if prev_key is not None and key < prev_key:
+            in_order = False
+        prev_key = key
 
-    parsed.sort(key=lambda x: (x["from"], 0 if x["insert"] else 1))
+    if not in_order:
+        parsed.sort(key=lambda x: (x["from"], 0 if x["insert"] else 1))
     for i in range(1, len(parsed)):
         prev, cur = parsed[i - 1], parsed[i]
         # Inserts at the same line don't overlap with each other or
@@ -261,80 +421,163 @@ def validate_edits(edits: list | None) -> tuple[list[dict], str]:
     return parsed, ""
 
 
-def apply_patch(path: str, edits: list[dict]) -> int:
+def apply_patch(path: str, edits: list[dict], durable: bool = False) -> int:
     """
     Apply sorted, validated edits by streaming to a temp file.
 
     Line numbers are 1-based. Edits use inclusive 'to'.
     Inserts have 'insert': True.
+    durable fsyncs the new file before it replaces path, and the
+    directory after.
     Returns total line count after patching.
     """
-    # Ensure content always ends with newline to prevent line merging
+    # (insert, from, to, content bytes, line count), built once so the
+    # splice loop unpacks tuples instead of doing dict lookups. The
+    # caller's edit dicts are left untouched.
+    prepared = []
     for e in edits:
-        if e["content"] and not e["content"].endswith("\n"):
-            e["content"] += "\n"
+        # Only edit content is encoded; the source is never decoded
+        data = e["content"].encode("utf-8")
+        # Ensure content always ends with newline to prevent line merging;
+        # its line count is then exactly the number of newlines
+        if data and not data.endswith(b"\n"):
+            data += b"\n"
+        prepared.append(
+            (e["insert"], e["from"], e["to"], data, data.count(b"\n"))
+        )
 
     dir_name = os.path.dirname(path) or "."
-    fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
+    fd, tmp_path = _open_temp(dir_name)
     try:
+        # Unbuffered: all I/O goes through the raw fds below
         with (
-            open(path, "r", encoding="utf-8", errors="replace") as src,
-            os.fdopen(fd, "w", encoding="utf-8") as dst,
+            open(path, "rb", buffering=0) as src,
+            os.fdopen(fd, "wb", buffering=0) as dst,
         ):
-            edit_idx = 0
-            line_no = 1  # 1-based
-            total_written = 0
-
-            for raw_line in src:
-                # Process all inserts targeting this line first
-                while (
-                    edit_idx < len(edits)
-                    and edits[edit_idx]["insert"]
-                    and edits[edit_idx]["from"] == line_no
-                ):
-                    edit = edits[edit_idx]
-                    if edit["content"]:
-                        dst.write(edit["content"])
-                        total_written += _count_content_lines(edit["content"])
-                    edit_idx += 1
-
-                # Check if current line falls in a replace/delete range
-                if edit_idx < len(edits) and not edits[edit_idx]["insert"]:
-                    edit = edits[edit_idx]
-                    if edit["from"] <= line_no <= edit["to"]:
-                        # Write replacement content once at range start
-                        if line_no == edit["from"] and edit["content"]:
-                            dst.write(edit["content"])
-                            total_written += _count_content_lines(
-                                edit["content"]
-                            )
-                        # Skip original line; advance edit at range end
-                        if line_no == edit["to"]:
-                            edit_idx += 1
-                        line_no += 1
-                        continue
-
-                dst.write(raw_line)
-                total_written += 1
-                line_no += 1
-
-            # Remaining edits past end of file
-            while edit_idx < len(edits):
-                edit = edits[edit_idx]
-                if edit["content"]:
-                    dst.write(edit["content"])
-                    total_written += _count_content_lines(edit["content"])
-                edit_idx += 1
-
-        shutil.move(tmp_path, path)
+            total_written = _splice_edits(src.fileno(), dst.fileno(), prepared)
+            if durable:
+                os.fsync(dst.fileno())
+            if tmp_path is None:
+                tmp_path = _link_temp(dst.fileno(), dir_name, durable)
+
+        os.replace(tmp_path, path)
+        _evict_read_cache(path)
+        if durable:
+            _fsync_dir(dir_name)
         return total_written
     except Exception:
-        if os.path.exists(tmp_path):
+        if tmp_path and os.path.exists(tmp_path):
             os.unlink(tmp_path)
         raise
 
 
-def patch_file(path: str, edits: list | None) -> PatchResult:
+def _open_temp(dir_name: str) -> tuple[int, str | None]:
+    """
+    Open a temp file for writing in dir_name. On Linux this is an unnamed
+    O_TMPFILE inode (path None) that only appears once complete; otherwise,
+    or where the filesystem lacks O_TMPFILE, a named mkstemp file.
+    """
+    if _USE_TMPFILE:
+        try:
+            # Same mode mkstemp would use; readable for _link_temp's fallback
+            return os.open(dir_name, os.O_TMPFILE | os.O_RDWR, 0o600), None
+        except OSError:
+            pass
+    return tempfile.mkstemp(dir=dir_name, suffix=".tmp")
+
+
+def _link_temp(fd: int, dir_name: str, durable: bool = False) -> str:
+    """
+    Name a finished O_TMPFILE inode so os.replace can swap it in. If the
+    /proc link is refused (some sandboxes and filesystems), copy into a
+    mkstemp file instead and stop using O_TMPFILE.
+    """
+    global _USE_TMPFILE
+    while True:
+        tmp_path = os.path.join(dir_name, f"tmp{os.urandom(4).hex()}.tmp")
+        try:
+            # linkat(AT_SYMLINK_FOLLOW) through the /proc fd link
+            os.link(f"/proc/self/fd/{fd}", tmp_path)
+            return tmp_path
+        except FileExistsError:
+            continue
+        except OSError:
+            break
+
+    _USE_TMPFILE = False
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
+    try:
+        _copy_range(fd, tmp_fd, 0, os.fstat(fd).st_size)
+        if durable:
+            os.fsync(tmp_fd)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    finally:
+        os.close(tmp_fd)
+    return tmp_path
+
+
+def _splice_edits(src_fd: int, dst_fd: int, edits: list[tuple]) -> int:
+    """
+    Write src with edits applied to dst. Edits are prepared tuples
+    (insert, from, to, data, nlines) from apply_patch. Untouched byte
+    ranges between edits are copied by the kernel.
+    Returns total line count written.
+    """
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(src_fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    read = functools.partial(_pread, src_fd)
+
+    pos = 0  # byte offset of the next unread source line
+    line_no = 1  # next unread source line, 1-based
+    total_written = 0
+    open_line = False  # output ends in a source line without "\n"
+    out: list[bytes] = []  # pending output, written together
+    out_size = 0
+
+    for insert, frm, to, data, nlines in edits:
+        gap = frm - line_no
+        if gap > 0:
+            end, lines, open_line = _skip_lines(read, pos, gap)
+            if end - pos <= _INLINE_GAP:
+                out.append(read(end - pos, pos))
+                out_size += end - pos
+            else:
+                _write_out(dst_fd, out)
+                out_size = 0
+                _copy_range(src_fd, dst_fd, pos, end - pos)
+            total_written += lines
+            pos = end
+            line_no += gap
+
+        if data:
+            total_written += nlines
+            if open_line:
+                # Keep content off the unterminated last source line
+                data = b"\n" + data
+                open_line = False
+            out.append(data)
+            out_size += len(data)
+        if out_size >= _WRITE_CHUNK:
+            _write_out(dst_fd, out)
+            out_size = 0
+
+        if not insert:
+            # Discard the replaced/deleted range
+            skip = to - line_no + 1
+            if skip > 0:
+                pos = _skip_lines(read, pos, skip)[0]
+                line_no += skip
+
+    _write_out(dst_fd, out)
+    # No edits left: bulk-copy the rest of the source
+    return total_written + _copy_rest(src_fd, dst_fd, pos)
+
+
+def patch_file(
+    path: str, edits: list | None, durable: bool = False
+) -> PatchResult:
     """Validate and apply edits to a file."""
     path = os.path.expanduser(path)
     if not os.path.isfile(path):
@@ -345,7 +588,7 @@ def patch_file(path: str, edits: list | None) -> PatchResult:
         return PatchResult(total_lines=0, edit_count=0, error=err)
 
     try:
-        total = apply_patch(path, parsed)
+        total = apply_patch(path, parsed, durable=durable)
     except Exception as exc:
         return PatchResult(total_lines=0, edit_count=0, error=str(exc))
 
@@ -356,7 +599,314 @@ def patch_file(path: str, edits: list | None) -> PatchResult:
 # Internal
 # ------------------------------------------------------------------
 
-def _count_content_lines(content: str) -> int:
-    return content.count("\n") + (
-        1 if content and not content.endswith("\n") else 0
+def _score_lines(
+    stripped_lines: list[str],
+    line_from: int,
+    num_width: int,
+    max_line_tokens: int,
+    max_total_read_tokens: int,
+) -> tuple[str, str]:
+    """Number, crop and budget lines. Returns (content, warnings)."""
+    kept, crops = _budget_scan(
+        stripped_lines, max_line_tokens, max_total_read_tokens
     )
+
+    # Format only the lines that survived the budget
+    shown = stripped_lines[:kept]
+    for i, keep_chars in crops.items():
+        if i < kept:
+            shown[i] = shown[i][:keep_chars] + "..."
+    # Width is fixed per call, so build the line template once
+    line_fmt = f"%{num_width}d %s"
+    output_lines = [
+        line_fmt % (line_no, text)
+        for line_no, text in enumerate(shown, line_from)
+    ]
+
+    warn_parts: list[str] = []
+    if crops:
+        nums = " ".join(str(line_from + i) for i in crops)
+        warn_parts.append(
+            f"long lines {nums} cropped - use terminal for precise manipulation"
+        )
+    if kept < len(stripped_lines):
+        actual_end = line_from + kept
+        warn_parts.append(
+            f"output trimmed at line {actual_end} due to token limit"
+            " - use line_from/line_to for remaining"
+        )
+
+    warn_str = ""
+    if warn_parts:
+        warn_str = "\nwarning: " + "; ".join(warn_parts)
+
+    return "\n".join(output_lines), warn_str
+
+
+def _budget_scan(
+    stripped_lines: list[str],
+    max_line_tokens: int,
+    max_total_read_tokens: int,
+) -> tuple[int, dict[int, int]]:
+    """
+    Walk line token counts against the per-line and total budgets.
+
+    Returns (number of lines kept, {line index: chars kept} for cropped lines).
+    """
+    crops: dict[int, int] = {}
+    running_tokens = 0
+
+    bounds = [_token_upper_bound(s) for s in stripped_lines]
+    if (
+        max(bounds, default=0) <= max_line_tokens
+        and sum(bounds) <= max_total_read_tokens
+    ):
+        # Nothing can be cropped or trimmed, exact counts are not needed
+        return len(stripped_lines), crops
+
+    line_counts: list[int] = []
+    for i in range(len(stripped_lines)):
+        if i == len(line_counts):
+            # Tokenize the next chunk, sized to roughly cover the remaining
+            # budget, so lines past the trim point are never tokenized
+            chunk_bytes = (
+                max_total_read_tokens - running_tokens
+            ) * _CHUNK_BYTES_PER_TOKEN
+            end = i + 1
+            taken = bounds[i]
+            while end < len(stripped_lines) and taken < chunk_bytes:
+                taken += bounds[end]
+                end += 1
+            line_counts += tokens.count_tokens_batch(stripped_lines[i:end])
+        line_tok = line_counts[i]
+
+        if line_tok > max_line_tokens:
+            chars_per_tok = max(len(stripped_lines[i]) / line_tok, 1)
+            crops[i] = int(max_line_tokens * chars_per_tok * tokens.TRIM_BUFFER)
+            line_tok = max_line_tokens
+
+        if running_tokens + line_tok > max_total_read_tokens:
+            return i, crops
+        running_tokens += line_tok
+
+    return len(stripped_lines), crops
+
+
+def _get_read_pool() -> ThreadPoolExecutor:
+    global _read_pool
+    if _read_pool is None:
+        _read_pool = ThreadPoolExecutor(
+            max_workers=min(8, os.cpu_count() or 1),
+            thread_name_prefix="text_editor_read",
+        )
+    return _read_pool
+
+
+def _open_regular_file(
+    path: str, max_bytes: int | None = None
+) -> tuple[int, os.stat_result] | None:
+    """
+    Open path read-only; the caller closes the returned fd. Returns None
+    when path is missing or not a regular file (checked on the open fd,
+    no extra stat). Raises OSError for files over max_bytes.
+    """
+    try:
+        # O_NONBLOCK so opening a FIFO cannot hang; no effect on files.
+        # O_BINARY so Windows does not translate newlines
+        flags = os.O_RDONLY | getattr(os, "O_NONBLOCK", 0)
+        fd = os.open(path, flags | getattr(os, "O_BINARY", 0))
+    except (FileNotFoundError, NotADirectoryError, IsADirectoryError, ValueError):
+        # ValueError: an embedded NUL, so no such file can exist
+        return None
+    try:
+        st = os.fstat(fd)
+        if stat.S_ISREG(st.st_mode):
+            if max_bytes is not None and st.st_size > max_bytes:
+                raise OSError(f"file too large ({st.st_size} bytes)")
+            return fd, st
+    except BaseException:
+        os.close(fd)
+        raise
+    os.close(fd)
+    return None
+
+
+def _read_whole(fd: int, path: str, st: os.stat_result) -> bytes:
+    """Read an open file whole; unchanged small files come from the read cache."""
+    global _read_cache_bytes
+    cacheable = st.st_size <= _READ_CACHE_MAX_FILE
+    key = (os.path.realpath(path), st.st_ino, st.st_mtime_ns, st.st_size)
+    if cacheable:
+        with _read_cache_lock:
+            buf = _read_cache.get(key)
+            if buf is not None:
+                _read_cache.move_to_end(key)
+                return buf
+
+    with open(fd, "rb", buffering=0, closefd=False) as f:
+        buf = f.read()
+
+    if cacheable and len(buf) == st.st_size:
+        with _read_cache_lock:
+            old = _read_cache.pop(key, None)
+            if old is not None:
+                _read_cache_bytes -= len(old)
+            _read_cache[key] = buf
+            _read_cache_bytes += len(buf)
+            while _read_cache_bytes > READ_CACHE_BYTES:
+                _read_cache_bytes -= len(_read_cache.popitem(last=False)[1])
+    return buf
+
+
+def _evict_read_cache(path: str):
+    # An in-place rewrite can keep inode, size and (on coarse clocks) mtime
+    global _read_cache_bytes
+    # realpath: a symlink spelling of the path must evict the same entry
+    path = os.path.realpath(path)
+    with _read_cache_lock:
+        for key in [key for key in _read_cache if key[0] == path]:
+            _read_cache_bytes -= len(_read_cache.pop(key))
+
+
+def _read_slice(buf: bytes, size: int, offset: int) -> bytes:
+    return buf[offset:offset + size]
+
+
+def clear_read_cache():
+    global _read_cache_bytes
+    with _read_cache_lock:
+        _read_cache.clear()
+        _read_cache_bytes = 0
+
+
+def _skip_lines(
+    read: Callable[[int, int], bytes], pos: int, count: int | None
+) -> tuple[int, int, bool]:
+    """
+    Scan forward from byte pos past count lines (None: to EOF).
+    read(size, offset) returns source bytes, like _pread on a bound fd.
+
+    Returns (end offset, lines passed, whether the last line passed is
+    unterminated at EOF).
+    """
+    lines = 0
+    open_line = False
+    size = _SCAN_CHUNK
+    while count is None or lines < count:
+        chunk = read(size, pos)
+        if not chunk:
+            if open_line:
+                lines += 1
+            return pos, lines, open_line
+        found = chunk.count(b"\n")
+        want = None if count is None else count - lines
+        if want is None or found < want:
+            lines += found
+            pos += len(chunk)
+            open_line = not chunk.endswith(b"\n")
+            # Long scans read progressively larger chunks
+            size = min(size * 2, _SCAN_CHUNK_MAX)
+            continue
+        # The last wanted line ends inside this chunk
+        rest = chunk.split(b"\n", want)[-1]
+        return pos + len(chunk) - len(rest), lines + want, False
+    return pos, lines, False
+
+
+def _seek_read(fd: int, size: int, offset: int) -> bytes:
+    # Windows has no pread; every fd read here belongs to a single call,
+    # so moving its file position is safe
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+_pread = os.pread if hasattr(os, "pread") else _seek_read
+
+
+def _copy_range(src_fd: int, dst_fd: int, offset: int, count: int):
+    while count > 0:
+        if _USE_SENDFILE:
+            sent = os.sendfile(dst_fd, src_fd, offset, count)
+        else:
+            sent = os.write(
+                dst_fd, _pread(src_fd, min(count, _COPY_CHUNK), offset)
+            )
+        if not sent:
+            break
+        offset += sent
+        count -= sent
+
+
+def _copy_rest(src_fd: int, dst_fd: int, pos: int) -> int:
+    """Copy src from pos to EOF; returns the number of lines copied."""
+    if _USE_SENDFILE:
+        read = functools.partial(_pread, src_fd)
+        end, lines, _ = _skip_lines(read, pos, None)
+        _copy_range(src_fd, dst_fd, pos, end - pos)
+        return lines
+
+    # Without sendfile, count and copy in the same pass
+    newlines = 0
+    last = b""
+    while chunk := _pread(src_fd, _COPY_CHUNK, pos):
+        _write_all(dst_fd, chunk)
+        newlines += chunk.count(b"\n")
+        pos += len(chunk)
+        last = chunk
+    return newlines + (1 if last and not last.endswith(b"\n") else 0)
+
+
+def _has_content(path: str, data: bytes) -> bool:
+    """Whether path is a regular file holding exactly data."""
+    try:
+        # Sizes differ for nearly every real change: compare without reading
+        if os.stat(path).st_size != len(data):
+            return False
+        opened = _open_regular_file(path)
+        if opened is None:
+            return False
+        fd, st = opened
+        try:
+            return _read_whole(fd, path, st) == data
+        finally:
+            os.close(fd)
+    except (OSError, ValueError):
+        return False
+
+
+def _fsync_dir(dir_name: str):
+    # Persists the directory entry; directories cannot be opened on Windows
+    if os.name != "posix":
+        return
+    fd = os.open(dir_name, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_out(fd: int, out: list[bytes]):
+    if out:
+        _write_all(fd, b"".join(out))
+        out.clear()
+
+
+def _write_all(fd: int, data: bytes):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _split_lines(text: str) -> list[str]:
+    """Split text on "\n" without line endings, dropping "\r" before "\n"."""
+    lines = text.split("\n")
+    if not lines[-1]:
+        lines.pop()  # text ended with "\n" or was empty
+    if "\r" in text:
+        lines = [line.rstrip("\r") for line in lines]
+    return lines
+
+
+def _token_upper_bound(text: str) -> int:
+    # Every token covers at least one UTF-8 byte
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
@@ -1,9 +1,15 @@
+import asyncio
+from typing import Any, Callable
+
 from helpers.tool import Tool, Response
 from helpers.extension import call_extensions_async
 from helpers import plugins, runtime
 from plugins._text_editor.helpers.file_ops import (
     FileInfo,
-    read_file,
+    count_content_lines,
+    format_content_for_display,
+    read_file_async,
+    read_files_batch,
     write_file,
     validate_edits,
     apply_patch,
@@ -21,6 +27,8 @@ class TextEditor(Tool):
     async def execute(self, **kwargs):
         if self.method == "read":
             return await self._read(**kwargs)
+        elif self.method == "read_batch":
+            return await self._read_batch(**kwargs)
         elif self.method == "write":
             return await self._write(**kwargs)
         elif self.method == "patch":
@@ -42,20 +50,61 @@ class TextEditor(Tool):
         raw_to = kwargs.get("line_to")
         line_to = int(raw_to) if raw_to is not None else None
 
-        result = await runtime.call_development_function(
-            read_file,
-            path,
-            line_from=line_from,
-            line_to=line_to,
-            max_line_tokens=cfg["max_line_tokens"],
-            default_line_count=cfg["default_line_count"],
-            max_total_read_tokens=cfg["max_total_read_tokens"],
+        # Read and metadata lookup share one RFC round trip
+        result, info = await runtime.call_development_batch([
+            (read_file_async, (path,), {
+                "line_from": line_from,
+                "line_to": line_to,
+                "max_line_tokens": cfg["max_line_tokens"],
+                "default_line_count": cfg["default_line_count"],
+                "max_total_read_tokens": cfg["max_total_read_tokens"],
+            }),
+            (file_info, (path,), {}),
+        ])
+
+        msg = await self._read_message(path, result, info)
+        return Response(message=msg, break_loop=False)
+
+    async def _read_batch(self, files=None, **kwargs) -> Response:
+        if not files or not isinstance(files, list):
+            return self._error("read", "", "files array is required")
+
+        specs: list[dict] = []
+        for f in files:
+            if not isinstance(f, dict) or not f.get("path"):
+                return self._error("read", "", f"invalid file entry: {f}")
+            raw_to = f.get("line_to")
+            specs.append({
+                "path": f["path"],
+                "line_from": int(f.get("line_from", 1)),
+                "line_to": int(raw_to) if raw_to is not None else None,
+            })
+
+        cfg = _get_config(self.agent)
+        # All reads and metadata lookups share one RFC round trip
+        results = await runtime.call_development_batch(
+            [(read_files_batch, (specs,), {
+                "max_line_tokens": cfg["max_line_tokens"],
+                "default_line_count": cfg["default_line_count"],
+                "max_total_read_tokens": cfg["max_total_read_tokens"],
+            })]
+            + [(file_info, (spec["path"],), {}) for spec in specs]
         )
 
+        messages = [
+            await self._read_message(spec["path"], result, info)
+            for spec, result, info in zip(specs, results[0], results[1:])
+        ]
+        return Response(message="\n\n".join(messages), break_loop=False)
+
+    async def _read_message(
+        self, path: str, result: dict, info: FileInfo
+    ) -> str:
         if result["error"]:
-            return self._error("read", path, result["error"])
+            return self.agent.read_prompt(
+                "fw.text_editor.read_error.md", path=path, error=result["error"]
+            )
 
-        info = await runtime.call_development_function(file_info, path)
         _record_mtime(self.agent, info, result["total_lines"])
 
         # Extension point
@@ -67,14 +116,13 @@ class TextEditor(Tool):
             "text_editor_read_after", agent=self.agent, data=ext_data
         )
 
-        msg = self.agent.read_prompt(
+        return self.agent.read_prompt(
             "fw.text_editor.read_ok.md",
             path=info["expanded"],
             total_lines=str(result["total_lines"]),
             warnings=ext_data["warnings"],
             content=ext_data["content"],
         )
-        return Response(message=msg, break_loop=False)
 
     # ------------------------------------------------------------------
     # WRITE
@@ -104,14 +152,16 @@ class TextEditor(Tool):
             data={"path": path, "total_lines": result["total_lines"]},
         )
 
+        # Refresh after the extension so a file it rewrote is not seen as stale
         info = await runtime.call_development_function(file_info, path)
         _record_mtime(self.agent, info, result["total_lines"])
 
+        # Display the content as requested instead of reading it back; any
+        # change a text_editor_write_after extension makes on disk is not shown
         cfg = _get_config(self.agent)
-        read_result = await runtime.call_development_function(
-            read_file,
-            info["expanded"],
-            line_from=1,
+        read_result = await asyncio.to_thread(
+            format_content_for_display,
+            ext_data["content"] or "",
             line_to=result["total_lines"],
             max_line_tokens=cfg["max_line_tokens"],
             max_total_read_tokens=cfg["max_total_read_tokens"],
@@ -165,18 +215,27 @@ class TextEditor(Tool):
             data={"path": expanded, "total_lines": total_lines},
         )
 
-        # Refresh file info after patch for updated mtime
-        post_info = await runtime.call_development_function(
-            file_info, expanded
-        )
+        # Refresh file info after patch for updated mtime and read back the
+        # patched region in one RFC round trip
+        calls: list[tuple[Callable[..., Any], tuple, dict]] = [
+            (file_info, (expanded,), {})
+        ]
+        region = _patch_region(ext_data["edits"], total_lines)
+        if region:
+            cfg = _get_config(self.agent)
+            calls.append((read_file_async, (expanded,), {
+                "line_from": region[0],
+                "line_to": region[1],
+                "max_line_tokens": cfg["max_line_tokens"],
+                "max_total_read_tokens": cfg["max_total_read_tokens"],
+            }))
+        results = await runtime.call_development_batch(calls)
+        post_info = results[0]
+        patch_content = results[1]["content"] if region else ""
         _apply_patch_post(
             self.agent, post_info, total_lines, ext_data["edits"]
         )
 
-        patch_content = await _read_patch_region(
-            expanded, ext_data["edits"], total_lines, _get_config(self.agent)
-        )
-
         msg = self.agent.read_prompt(
             "fw.text_editor.patch_ok.md",
             path=expanded,
@@ -200,17 +259,15 @@ class TextEditor(Tool):
 # Standalone helpers
 # ------------------------------------------------------------------
 
-async def _read_patch_region(
-    path: str, edits: list[dict], total_lines: int, cfg: dict
-) -> str:
+def _patch_region(
+    edits: list[dict], total_lines: int
+) -> tuple[int, int] | None:
     if not edits:
-        return ""
+        return None
 
     min_from = min(e["from"] for e in edits)
     added = sum(
-        e["content"].count("\n")
-        + (1 if e["content"] and not e["content"].endswith("\n") else 0)
-        for e in edits if e.get("content")
+        count_content_lines(e["content"]) for e in edits if e.get("content")
     )
     removed = sum(
         max(e["to"] - e["from"] + 1, 0)
@@ -218,16 +275,7 @@ async def _read_patch_region(
     )
     max_to = max(e["to"] for e in edits)
     end_line = max_to + added - removed + 3
-
-    result = await runtime.call_development_function(
-        read_file,
-        path,
-        line_from=max(min_from - 1, 1),
-        line_to=min(end_line, total_lines),
-        max_line_tokens=cfg["max_line_tokens"],
-        max_total_read_tokens=cfg["max_total_read_tokens"],
-    )
-    return result["content"]
+    return max(min_from - 1, 1), min(end_line, total_lines)
 
 
 def _record_mtime(agent, info: FileInfo, total_lines: int):
@@ -239,18 +287,12 @@ def _record_mtime(agent, info: FileInfo, total_lines: int):
         }
 
 
-def _count_content_lines(content: str) -> int:
-    return content.count("\n") + (
-        1 if content and not content.endswith("\n") else 0
-    )
-
-
 def _all_edits_in_place(edits: list[dict]) -> bool:
     for e in edits:
         if e.get("insert"):
             return False
         removed = max(e["to"] - e["from"] + 1, 0)
-        added = _count_content_lines(e.get("content", "") or "")
+        added = count_content_lines(e.get("content", "") or "")
         if removed != added:
             return False
     return True
@@ -0,0 +1,90 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import rfc, runtime
+from plugins._text_editor.helpers.file_ops import count_content_lines, file_info
+
+
+async def _fake_call_rfc(sent, url, password, module, function_name, args, kwargs):
+    """Stand-in for the RFC transport: JSON round trip, then run "remotely"."""
+    sent.append((module, function_name))
+    args, kwargs = json.loads(json.dumps([args, kwargs]))
+    result = await rfc._call_function(module, function_name, *args, **kwargs)
+    return json.loads(json.dumps(result))
+
+
+@pytest.fixture
+def development(monkeypatch):
+    sent: list[tuple[str, str]] = []
+
+    async def call_rfc(**kwargs):
+        return await _fake_call_rfc(sent, **kwargs)
+
+    monkeypatch.setattr(runtime, "is_development", lambda: True)
+    monkeypatch.setattr(runtime, "_get_rfc_url", lambda: "http://rfc.test")
+    monkeypatch.setattr(runtime, "_get_rfc_password", lambda: "secret")
+    monkeypatch.setattr(rfc, "call_rfc", call_rfc)
+    return sent
+
+
+async def _add(a, b=0):
+    return a + b
+
+
+@pytest.mark.asyncio
+async def test_batch_sends_one_rfc_and_keeps_call_order(development, tmp_path):
+    path = str(tmp_path / "missing.txt")
+
+    results = await runtime.call_development_batch([
+        (count_content_lines, ("a\nb",), {}),
+        (file_info, (path,), {}),
+        (count_content_lines, ("x\n",), {}),
+    ])
+
+    assert development == [("helpers.runtime", "_run_batch")]
+    assert results[0] == 2
+    assert results[1]["expanded"] == path
+    assert results[1]["exists"] is False
+    assert results[2] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_mixes_sync_and_async_functions(development):
+    from plugins._text_editor.helpers.file_ops import read_files_batch
+
+    results = await runtime.call_development_batch([
+        (read_files_batch, ([],), {}),
+        (count_content_lines, ("",), {}),
+    ])
+
+    assert results == [[], 0]
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_locally_outside_development(monkeypatch):
+    monkeypatch.setattr(runtime, "is_development", lambda: False)
+
+    async def fail(**kwargs):
+        raise AssertionError("no RFC outside development")
+
+    monkeypatch.setattr(rfc, "call_rfc", fail)
+
+    results = await runtime.call_development_batch([
+        (_add, (1,), {"b": 2}),
+        (count_content_lines, ("a\nb\n",), {}),
+        (_add, (3,), {}),
+    ])
+
+    assert results == [3, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_batch_of_nothing_returns_empty(development):
+    assert await runtime.call_development_batch([]) == []
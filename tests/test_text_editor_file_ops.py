@@ -0,0 +1,406 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import tokens
+from plugins._text_editor.helpers import file_ops
+
+
+class _CharEncoding:
+    """Offline stand-in for a tiktoken encoding: one token per character."""
+
+    encoded: list[str] = []
+    batch_calls: list[list[str]] = []
+
+    def encode(self, text, **kwargs):
+        return list(text)
+
+    def encode_ordinary(self, text):
+        self.encoded.append(text)
+        return list(text)
+
+    def encode_ordinary_batch(self, texts, **kwargs):
+        self.batch_calls.append(list(texts))
+        self.encoded.extend(texts)
+        return [list(text) for text in texts]
+
+
+@pytest.fixture(autouse=True)
+def char_tokenizer(monkeypatch):
+    tokens.clear_line_cache()
+    file_ops.clear_read_cache()
+    _CharEncoding.encoded = []
+    _CharEncoding.batch_calls = []
+    monkeypatch.setattr(tokens, "_get_encoding", lambda name: _CharEncoding())
+    yield
+    tokens.clear_line_cache()
+    file_ops.clear_read_cache()
+
+
+def _write(tmp_path, text: str) -> str:
+    path = tmp_path / "sample.txt"
+    path.write_bytes(text.encode("utf-8"))
+    return str(path)
+
+
+def test_read_file_numbers_selected_lines(tmp_path):
+    path = _write(tmp_path, "".join(f"line {i}\n" for i in range(1, 13)))
+
+    result = file_ops.read_file(path, line_from=9, line_to=11)
+
+    assert result["error"] == ""
+    assert result["total_lines"] == 12
+    assert result["content"] == " 9 line 9\n10 line 10\n11 line 11"
+    assert result["warnings"] == ""
+
+
+@pytest.mark.asyncio
+async def test_read_file_async_matches_read_file(tmp_path):
+    path = _write(tmp_path, "".join(f"row {i}\n" for i in range(30)))
+
+    result = await file_ops.read_file_async(path, line_from=5, line_to=20)
+
+    assert result == file_ops.read_file(path, line_from=5, line_to=20)
+
+
+def test_format_content_for_display_matches_read_back(tmp_path):
+    content = "alpha\r\n" + "b" * 40 + "\n\nlast"
+    path = str(tmp_path / "written.txt")
+    file_ops.write_file(path, content)
+    budget = {"max_line_tokens": 10, "max_total_read_tokens": 30}
+
+    shown = file_ops.format_content_for_display(content, line_to=4, **budget)
+
+    assert shown == file_ops.read_file(path, line_to=4, **budget)
+    assert shown["total_lines"] == 4
+
+
+@pytest.mark.asyncio
+async def test_read_files_batch_keeps_spec_order(tmp_path):
+    first = tmp_path / "first.txt"
+    first.write_text("one\ntwo\nthree\n")
+    second = tmp_path / "second.txt"
+    second.write_text("alpha\nbeta\n")
+
+    results = await file_ops.read_files_batch([
+        {"path": str(second)},
+        {"path": str(first), "line_from": 2, "line_to": 3},
+        {"path": str(tmp_path / "missing.txt")},
+    ])
+
+    assert [r["content"] for r in results] == [
+        "1 alpha\n2 beta", "2 two\n3 three", ""
+    ]
+    assert results[2]["error"] == "file not found"
+
+
+def test_read_file_scans_large_files_from_fd(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_ops, "_READ_CACHE_MAX_FILE", 0)
+    monkeypatch.setattr(file_ops, "_SCAN_CHUNK", 8)
+    path = _write(tmp_path, "".join(f"line {i}\n" for i in range(1, 13)) + "end")
+
+    result = file_ops.read_file(path, line_from=11, line_to=12)
+
+    assert result["content"] == "11 line 11\n12 line 12"
+    assert result["total_lines"] == 13
+    assert file_ops._read_cache == {}
+
+
+def test_read_file_counts_unterminated_last_line(tmp_path):
+    path = _write(tmp_path, "a\r\nb\r\nc")
+
+    result = file_ops.read_file(path, line_from=2, line_to=99)
+
+    assert result["total_lines"] == 3
+    assert result["content"] == "2 b\n3 c"
+
+
+def test_read_file_crops_long_lines(tmp_path):
+    path = _write(tmp_path, "short\n" + "x" * 50 + "\r\nend\n")
+
+    result = file_ops.read_file(path, max_line_tokens=10)
+
+    lines = result["content"].split("\n")
+    assert lines[0] == "1 short"
+    assert lines[1] == "2 " + "x" * 8 + "..."
+    assert lines[2] == "3 end"
+    assert "long lines 2 cropped" in result["warnings"]
+
+
+def test_read_file_trims_at_total_budget(tmp_path):
+    path = _write(tmp_path, "".join("abcd\n" for _ in range(10)))
+
+    result = file_ops.read_file(path, max_total_read_tokens=14)
+
+    assert result["content"].split("\n") == [" 1 abcd", " 2 abcd", " 3 abcd"]
+    assert "output trimmed at line 4" in result["warnings"]
+
+
+def test_read_file_stops_tokenizing_past_budget(tmp_path):
+    path = _write(tmp_path, "".join(f"{i:04}\n" for i in range(1000)))
+
+    result = file_ops.read_file(path, line_to=1000, max_total_read_tokens=20)
+
+    assert len(result["content"].split("\n")) == 5
+    assert "output trimmed at line 6" in result["warnings"]
+    assert len(_CharEncoding.encoded) < 50
+
+
+def test_read_file_skips_tokenizer_when_window_fits(tmp_path):
+    path = _write(tmp_path, "ab\ncd\n")
+
+    result = file_ops.read_file(path, max_line_tokens=2, max_total_read_tokens=4)
+
+    assert result["content"] == "1 ab\n2 cd"
+    assert result["warnings"] == ""
+    assert _CharEncoding.encoded == []
+
+
+def test_count_tokens_batch_reuses_cached_lines():
+    assert tokens.count_tokens_batch(["ab", "ab", "cde"]) == [2, 2, 3]
+    assert tokens.count_tokens_batch(["cde", "f", "ab"]) == [3, 1, 2]
+
+    assert _CharEncoding.encoded == ["ab", "cde", "f"]
+    assert _CharEncoding.batch_calls == []
+
+
+def test_count_tokens_batch_threads_only_large_inputs(monkeypatch):
+    monkeypatch.setattr(tokens, "BATCH_THREADS_MIN_CHARS", 6)
+
+    assert tokens.count_tokens_batch(["abc", "de"]) == [3, 2]
+    assert tokens.count_tokens_batch(["fgh", "ijk"]) == [3, 3]
+
+    assert _CharEncoding.batch_calls == [["fgh", "ijk"]]
+
+
+def test_read_file_cache_follows_file_changes(tmp_path):
+    path = _write(tmp_path, "one\ntwo\n")
+
+    assert file_ops.read_file(path)["content"] == "1 one\n2 two"
+    assert len(file_ops._read_cache) == 1
+
+    file_ops.patch_file(path, [{"from": 2, "to": 2, "content": "TWO"}])
+    assert file_ops._read_cache == {}
+
+    assert file_ops.read_file(path)["content"] == "1 one\n2 TWO"
+    assert len(file_ops._read_cache) == 1
+
+
+def test_write_file_evicts_same_stat_rewrite(tmp_path):
+    path = tmp_path / "same.txt"
+    file_ops.write_file(str(path), "aaa\n")
+    before = path.stat()
+    assert file_ops.read_file(str(path))["content"] == "1 aaa"
+
+    file_ops.write_file(str(path), "bbb\n")
+    # Coarse mtime clock: the rewrite leaves inode, size and mtime as they were
+    os.utime(path, ns=(before.st_atime_ns, before.st_mtime_ns))
+
+    assert file_ops.read_file(str(path))["content"] == "1 bbb"
+
+
+def test_write_through_symlink_evicts_cached_target(tmp_path):
+    target = tmp_path / "target.txt"
+    link = tmp_path / "link.txt"
+    file_ops.write_file(str(target), "aaa\n")
+    link.symlink_to(target)
+    before = target.stat()
+    assert file_ops.read_file(str(target))["content"] == "1 aaa"
+
+    file_ops.write_file(str(link), "bbb\n")
+    os.utime(target, ns=(before.st_atime_ns, before.st_mtime_ns))
+
+    assert file_ops.read_file(str(target))["content"] == "1 bbb"
+    assert file_ops.read_file(str(link))["content"] == "1 bbb"
+
+
+def test_read_cache_is_bounded_by_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_ops, "READ_CACHE_BYTES", 10)
+    first = tmp_path / "first.txt"
+    first.write_text("12345\n")
+    second = tmp_path / "second.txt"
+    second.write_text("67890\n")
+
+    file_ops.read_file(str(first))
+    file_ops.read_file(str(second))
+
+    assert [key[0] for key in file_ops._read_cache] == [os.path.realpath(second)]
+    assert file_ops._read_cache_bytes == 6
+
+
+def test_read_file_reports_missing_and_directories(tmp_path):
+    assert file_ops.read_file(str(tmp_path / "nope.txt"))["error"] == "file not found"
+    assert file_ops.read_file(str(tmp_path))["error"] == "file not found"
+
+
+def test_read_file_rejects_files_over_max_bytes(tmp_path):
+    path = _write(tmp_path, "0123456789\n")
+
+    assert file_ops.read_file(path, max_bytes=11)["error"] == ""
+    result = file_ops.read_file(path, max_bytes=10)
+
+    assert result["error"] == "file too large (11 bytes)"
+    assert result["content"] == ""
+
+
+def test_paths_with_nul_read_as_missing(tmp_path):
+    path = str(tmp_path / "bad\x00name.txt")
+
+    assert file_ops.read_file(path)["error"] == "file not found"
+    info = file_ops.file_info(path)
+    assert (info["exists"], info["is_file"], info["realpath"]) == (
+        False, False, path
+    )
+
+
+def test_read_file_rejects_binary(tmp_path):
+    path = tmp_path / "blob.bin"
+    path.write_bytes(b"abc\x00def")
+
+    result = file_ops.read_file(str(path))
+
+    assert result["error"] == "file appears binary, use terminal instead"
+
+
+def test_write_then_patch_roundtrip(tmp_path):
+    path = str(tmp_path / "sub" / "file.txt")
+
+    written = file_ops.write_file(path, "a\nb\nc\nd")
+    assert written == {"total_lines": 4, "error": ""}
+
+    result = file_ops.patch_file(
+        path,
+        [
+            {"from": 1, "content": "top"},
+            {"from": 2, "to": 3, "content": "B\nC\nC2\n"},
+            {"from": 4, "to": 4},
+            {"from": 5, "content": "tail\n"},
+        ],
+    )
+
+    assert result == {"total_lines": 6, "edit_count": 4, "error": ""}
+    assert Path(path).read_text() == "top\na\nB\nC\nC2\ntail\n"
+
+
+def test_apply_patch_copies_gaps_between_sparse_edits(tmp_path):
+    path = _write(tmp_path, "".join(f"{i}\n" for i in range(1, 11)))
+
+    parsed, err = file_ops.validate_edits(
+        [
+            {"from": 3, "to": 3, "content": "three"},
+            {"from": 7, "to": 8, "content": "seven\n"},
+            {"from": 10, "to": 12},
+        ]
+    )
+    assert err == ""
+
+    assert file_ops.apply_patch(path, parsed) == 8
+    assert Path(path).read_text() == "1\n2\nthree\n4\n5\n6\nseven\n9\n"
+    assert parsed[0]["content"] == "three"
+
+
+def test_apply_patch_keeps_untouched_bytes(tmp_path):
+    path = tmp_path / "crlf.txt"
+    path.write_bytes(b"one\r\ntwo\r\n\xff\xfe raw\r\nlast")
+
+    parsed, _ = file_ops.validate_edits(
+        [{"from": 2, "to": 2, "content": "TWO\r\n"}, {"from": 9, "content": "end"}]
+    )
+
+    assert file_ops.apply_patch(str(path), parsed) == 5
+    assert path.read_bytes() == (
+        b"one\r\nTWO\r\n\xff\xfe raw\r\nlast\nend\n"
+    )
+
+
+@pytest.mark.parametrize("use_tmpfile", [True, False])
+def test_apply_patch_leaves_no_temp_files(tmp_path, monkeypatch, use_tmpfile):
+    monkeypatch.setattr(file_ops, "_USE_TMPFILE", use_tmpfile)
+    path = _write(tmp_path, "a\nb\n")
+
+    parsed, _ = file_ops.validate_edits([{"from": 2, "to": 2, "content": "B"}])
+
+    assert file_ops.apply_patch(path, parsed) == 2
+
+    assert Path(path).read_text() == "a\nB\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["sample.txt"]
+
+
+def test_write_file_skips_unchanged_content(tmp_path, monkeypatch):
+    path = tmp_path / "same.txt"
+    file_ops.write_file(str(path), "x\ny")
+    os.utime(path, ns=(1, 1))
+
+    assert file_ops.write_file(str(path), "x\ny") == {"total_lines": 2, "error": ""}
+    assert path.stat().st_mtime_ns == 1
+
+    monkeypatch.setattr(file_ops, "_READ_CACHE_MAX_FILE", 0)
+    file_ops.write_file(str(path), "x\ny")
+    assert path.stat().st_mtime_ns == 1
+
+    file_ops.write_file(str(path), "x\ny", skip_if_unchanged=False)
+    assert path.stat().st_mtime_ns != 1
+    file_ops.write_file(str(path), "x\nz")
+    assert path.read_text() == "x\nz"
+
+
+def test_durable_write_and_patch_fsync_file_and_directory(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(file_ops.os, "fsync", synced.append)
+    monkeypatch.setattr(file_ops, "_USE_TMPFILE", False)
+    path = str(tmp_path / "durable.txt")
+
+    file_ops.write_file(path, "a\n")
+    file_ops.patch_file(path, [{"from": 1, "to": 1, "content": "b"}])
+    assert synced == []
+
+    file_ops.write_file(path, "a\n", durable=True)
+    assert len(synced) == 2
+    file_ops.patch_file(path, [{"from": 1, "to": 1, "content": "b"}], durable=True)
+    assert len(synced) == 4
+    assert Path(path).read_text() == "b\n"
+
+
+def test_patch_and_read_work_without_pread(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_ops, "_pread", file_ops._seek_read)
+    monkeypatch.setattr(file_ops, "_USE_SENDFILE", False)
+    monkeypatch.setattr(file_ops, "_READ_CACHE_MAX_FILE", 0)
+    path = _write(tmp_path, "".join(f"{i}\n" for i in range(1, 8)) + "tail")
+
+    parsed, _ = file_ops.validate_edits([{"from": 3, "to": 4, "content": "x"}])
+    assert file_ops.apply_patch(path, parsed) == 7
+
+    result = file_ops.read_file(path, line_from=2, line_to=4)
+    assert result["content"] == "2 2\n3 x\n4 5"
+    assert result["total_lines"] == 7
+
+
+def test_validate_edits_rejects_overlap():
+    parsed, err = file_ops.validate_edits(
+        [{"from": 5, "to": 8, "content": "x"}, {"from": 2, "to": 6}]
+    )
+
+    assert parsed == []
+    assert err.startswith("overlapping edits: edit at 2 (to 6) and 5")
+
+
+def test_file_info_reports_file_directory_and_missing(tmp_path):
+    path = _write(tmp_path, "x\n")
+
+    info = file_ops.file_info(path)
+    assert (info["exists"], info["is_file"]) == (True, True)
+    assert info["mtime"] == Path(path).stat().st_mtime
+
+    folder = file_ops.file_info(str(tmp_path))
+    assert (folder["exists"], folder["is_file"]) == (True, False)
+
+    missing = file_ops.file_info(str(tmp_path / "nope.txt"))
+    assert (missing["exists"], missing["is_file"], missing["mtime"]) == (
+        False, False, None
+    )
@@ -0,0 +1,141 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from helpers import runtime, tokens
+from plugins._text_editor.helpers import file_ops
+import plugins._text_editor.tools.text_editor as text_editor_module
+
+
+class _CharEncoding:
+    """Offline stand-in for a tiktoken encoding: one token per character."""
+
+    def encode_ordinary(self, text):
+        return list(text)
+
+
+class DummyAgent:
+    def __init__(self) -> None:
+        self.data: dict = {}
+
+    def read_prompt(self, file: str, **kwargs) -> str:
+        args = " ".join(f"{key}={value}" for key, value in sorted(kwargs.items()))
+        return f"<{file} {args}>"
+
+
+@pytest.fixture
+def tool(monkeypatch):
+    extension_calls: list[tuple[str, dict]] = []
+
+    async def fake_call_extensions(name, agent=None, **kwargs):
+        extension_calls.append((name, kwargs.get("data", {})))
+
+    tokens.clear_line_cache()
+    file_ops.clear_read_cache()
+    monkeypatch.setattr(tokens, "_get_encoding", lambda name: _CharEncoding())
+    monkeypatch.setattr(runtime, "is_development", lambda: False)
+    monkeypatch.setattr(
+        text_editor_module, "call_extensions_async", fake_call_extensions
+    )
+    monkeypatch.setattr(
+        text_editor_module,
+        "_get_config",
+        lambda agent: {
+            "max_line_tokens": 500,
+            "default_line_count": 100,
+            "max_total_read_tokens": 4000,
+        },
+    )
+
+    editor = text_editor_module.TextEditor(
+        agent=DummyAgent(),  # type: ignore[arg-type]
+        name="text_editor",
+        method="read_batch",
+        args={},
+        message="",
+        loop_data=None,
+    )
+    editor.extension_calls = extension_calls  # type: ignore[attr-defined]
+    yield editor
+    tokens.clear_line_cache()
+    file_ops.clear_read_cache()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("files", "error"),
+    [
+        (None, "files array is required"),
+        ({"path": "a.txt"}, "files array is required"),
+        ([{"line_from": 2}], "invalid file entry: {'line_from': 2}"),
+        (["a.txt"], "invalid file entry: a.txt"),
+    ],
+)
+async def test_read_batch_validates_files(tool, files, error):
+    response = await tool.execute(files=files)
+
+    assert response.message == (
+        f"<fw.text_editor.read_error.md error={error} path=>"
+    )
+    assert tool.agent.data == {}
+
+
+@pytest.mark.asyncio
+async def test_read_batch_joins_messages_in_order(tool, tmp_path):
+    first = tmp_path / "first.txt"
+    first.write_text("one\ntwo\nthree\n")
+    second = tmp_path / "second.txt"
+    second.write_text("alpha\n")
+    missing = str(tmp_path / "missing.txt")
+
+    response = await tool.execute(
+        files=[
+            {"path": str(first), "line_from": 2, "line_to": "3"},
+            {"path": missing},
+            {"path": str(second)},
+        ]
+    )
+
+    assert response.break_loop is False
+    assert response.message.split("\n\n") == [
+        f"<fw.text_editor.read_ok.md content=2 two\n3 three path={first} "
+        "total_lines=3 warnings=>",
+        f"<fw.text_editor.read_error.md error=file not found path={missing}>",
+        f"<fw.text_editor.read_ok.md content=1 alpha path={second} "
+        "total_lines=1 warnings=>",
+    ]
+    assert [name for name, _ in tool.extension_calls] == [
+        "text_editor_read_after",
+        "text_editor_read_after",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_read_batch_records_mtime_per_file(tool, tmp_path):
+    first = tmp_path / "first.txt"
+    first.write_text("one\ntwo\n")
+    second = tmp_path / "second.txt"
+    second.write_text("alpha\n")
+    os.utime(second, ns=(1_000_000_000, 1_000_000_000))
+
+    await tool.execute(
+        files=[
+            {"path": str(first)},
+            {"path": str(second)},
+            {"path": str(tmp_path / "missing.txt")},
+        ]
+    )
+
+    assert tool.agent.data[text_editor_module._MTIME_KEY] == {
+        os.path.realpath(first): {
+            "mtime": first.stat().st_mtime,
+            "total_lines": 2,
+        },
+        os.path.realpath(second): {"mtime": 1.0, "total_lines": 1},
+    }